@@ -13,10 +13,14 @@ Run:
     streamlit run app.py
 """
 
+import asyncio
 import os
-import re
 import shutil
 import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import streamlit as st
@@ -121,111 +125,354 @@ _FFMPEG_SEARCH_DIRS = [
     os.path.expanduser(r"~\Downloads\ffmpeg\bin"),
 ]
 
+# Remembers where the fallback search found ffmpeg, across app launches
+_FFMPEG_CACHE_FILE = Path.home() / ".ytdl_ffmpeg_cache"
+_FFMPEG_SCAN_DEPTH = 3
 
+
+def _scan_for_ffmpeg(root: str, max_depth: int = _FFMPEG_SCAN_DEPTH) -> str | None:
+    """
+    Breadth-first search for ffmpeg.exe under *root*, at most *max_depth*
+    directories deep.  Returns the containing directory or None.
+    """
+    queue = deque([(root, 0)])
+    while queue:
+        directory, depth = queue.popleft()
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file(follow_symlinks=False):
+                        if entry.name.lower() == "ffmpeg.exe":
+                            return directory
+                    elif depth < max_depth and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+        except OSError:
+            continue
+        queue.extend((sub, depth + 1) for sub in subdirs)
+    return None
+
+
+def _read_ffmpeg_cache() -> str | None:
+    """Return the cached ffmpeg directory if it still contains ffmpeg.exe."""
+    try:
+        cached = _FFMPEG_CACHE_FILE.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if cached and os.path.isfile(os.path.join(cached, "ffmpeg.exe")):
+        return cached
+    return None
+
+
+def _write_ffmpeg_cache(directory: str) -> None:
+    """Persist the ffmpeg directory; failures are harmless and ignored."""
+    try:
+        _FFMPEG_CACHE_FILE.write_text(directory, encoding="utf-8")
+    except OSError:
+        pass
+
+
+@st.cache_resource(show_spinner=False)
 def _find_ffmpeg() -> str | None:
     """
-    Locate the directory containing ffmpeg.exe.
-    Checks the system PATH first, then common Windows install locations.
+    Locate the directory containing ffmpeg.exe when it is not on PATH.
+    Checks the location remembered from a previous launch, then common
+    Windows install locations.
     Returns the directory path or None if not found.
     """
-    # 1. Check PATH
-    path_result = shutil.which("ffmpeg")
-    if path_result:
-        return str(Path(path_result).parent)
+    # 1. Reuse the result of an earlier search
+    cached = _read_ffmpeg_cache()
+    if cached:
+        return cached
 
     # 2. Check common Windows locations
+    found = None
     for search_dir in _FFMPEG_SEARCH_DIRS:
         candidate = os.path.join(search_dir, "ffmpeg.exe")
         if os.path.isfile(candidate):
-            return search_dir
+            found = search_dir
+            break
 
-    # 3. Recursive search in C:\ffmpeg (covers nested extractions)
+    # 3. Bounded search in C:\ffmpeg (covers nested extractions)
     ffmpeg_root = r"C:\ffmpeg"
-    if os.path.isdir(ffmpeg_root):
-        for root, _dirs, files in os.walk(ffmpeg_root):
-            if "ffmpeg.exe" in files:
-                return root
+    if found is None and os.path.isdir(ffmpeg_root):
+        found = _scan_for_ffmpeg(ffmpeg_root)
 
-    return None
+    if found:
+        _write_ffmpeg_cache(found)
+    return found
 
 
-# Cache the result so we only search once per app run
-FFMPEG_DIR: str | None = _find_ffmpeg()
+# Only the cheap PATH lookup runs at import; the filesystem fallbacks in
+# _find_ffmpeg are deferred until something actually needs ffmpeg.
+_FFMPEG_ON_PATH = shutil.which("ffmpeg")
+FFMPEG_DIR: str | None = str(Path(_FFMPEG_ON_PATH).parent) if _FFMPEG_ON_PATH else None
+
+
+def _ffmpeg_dir() -> str | None:
+    """Return the ffmpeg directory, searching beyond PATH on first need."""
+    if FFMPEG_DIR:
+        return FFMPEG_DIR
+    found = _find_ffmpeg()
+    if found is None:
+        # Only remember hits, so an ffmpeg installed while the app is
+        # running is picked up on the next rerun.
+        _find_ffmpeg.clear()
+    return found
 
 
 def _ffmpeg_available() -> bool:
     """Return True if ffmpeg was found anywhere on the system."""
-    return FFMPEG_DIR is not None
+    return _ffmpeg_dir() is not None
 
 
 # ─────────────────────────────────────────────
 # Helper: validate YouTube URL
 # ─────────────────────────────────────────────
-_YT_REGEX = re.compile(
-    r"^(https?://)?(www\.)?"
-    r"(youtube\.com/watch\?v=|youtu\.be/|youtube\.com/shorts/)"
-    r"[\w\-]{11}"
+# Every accepted prefix: optional scheme, optional "www.", then the path
+# that precedes the 11-character video ID.
+_YT_PREFIXES = tuple(
+    scheme + www + path
+    for scheme in ("https://", "http://", "")
+    for www in ("www.", "")
+    for path in ("youtube.com/watch?v=", "youtu.be/", "youtube.com/shorts/")
+)
+_YT_ID_LEN = 11
+_YT_ID_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
 )
 
 
 def is_valid_youtube_url(url: str) -> bool:
-    """Quick regex check before hitting the network."""
-    return bool(_YT_REGEX.search(url.strip()))
+    """Quick prefix + video-ID check before hitting the network."""
+    u = url.strip()
+    for prefix in _YT_PREFIXES:
+        if u.startswith(prefix):
+            video_id = u[len(prefix):len(prefix) + _YT_ID_LEN]
+            return len(video_id) == _YT_ID_LEN and _YT_ID_CHARS.issuperset(video_id)
+    return False
+
+
+# ─────────────────────────────────────────────
+# Core: shared metadata extractor
+# ─────────────────────────────────────────────
+_EXTRACT_WORKERS = 8
+
+
+@st.cache_resource(show_spinner=False)
+def _extract_pool() -> tuple[ThreadPoolExecutor, threading.local]:
+    """
+    Return the long-lived thread pool used for metadata extraction, plus
+    the thread-local slot where each worker keeps its own YoutubeDL.
+
+    Workers outlive script reruns, so each one's YoutubeDL keeps its HTTP
+    connections open and repeated lookups skip the TCP/TLS handshake.
+    A YoutubeDL is not safe to share between threads, hence one per worker.
+    """
+    return ThreadPoolExecutor(max_workers=_EXTRACT_WORKERS), threading.local()
+
+
+def _extract_one(
+    local: threading.local,
+    url: str,
+    process: bool = True,
+    ffmpeg_dir: str | None = None,
+) -> dict:
+    """
+    Run a metadata-only extraction on the calling worker's YoutubeDL,
+    creating it in *local* on first use.  With ``process=False`` the raw
+    extractor result is returned, before any format selection.
+    *ffmpeg_dir* is resolved by the caller on the script thread.
+    """
+    ydl = getattr(local, "ydl", None)
+    if ydl is None:
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            # 'extract_flat' is intentionally NOT set so we get full format list
+        }
+        if ffmpeg_dir:
+            ydl_opts["ffmpeg_location"] = ffmpeg_dir
+        ydl = local.ydl = yt_dlp.YoutubeDL(ydl_opts)
+    return ydl.extract_info(url, download=False, process=process)
+
+
+async def _batch_info(urls: list[str], process: bool = True) -> list[dict]:
+    """Extract several URLs concurrently; results keep the input order."""
+    loop = asyncio.get_running_loop()
+    pool, local = _extract_pool()
+    ffmpeg_dir = _ffmpeg_dir()
+    return await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _extract_one, local, u, process, ffmpeg_dir)
+            for u in urls
+        )
+    )
+
+
+def _extract_many(urls: list[str], process: bool = True) -> list[dict]:
+    """
+    Fetch metadata for every URL, overlapping the network round-trips.
+    Raises the first extraction error encountered.
+    """
+    return asyncio.run(_batch_info(urls, process))
+
+
+def _extract_info(url: str, process: bool = True) -> dict:
+    """Fetch metadata for a single URL through the extraction pool."""
+    return _extract_many([url], process)[0]
 
 
 # ─────────────────────────────────────────────
 # Core: fetch video metadata
 # ─────────────────────────────────────────────
-@st.cache_data(show_spinner=False, ttl=600)
+# Entries younger than the soft TTL are served as-is; between the soft and
+# hard TTL they are served immediately while a background refresh runs;
+# past the hard TTL the caller waits for a fresh extraction.
+_INFO_SOFT_TTL = 600
+_INFO_HARD_TTL = 3600
+
+
+@st.cache_resource(show_spinner=False)
+def _info_cache() -> tuple[dict[str, dict], set[str], threading.Lock]:
+    """
+    Return the process-wide video-info cache: entries keyed by URL (each
+    ``{"info": dict, "fetched_at": float}``), the set of URLs currently
+    being refreshed, and the lock guarding both.
+    """
+    return {}, set(), threading.Lock()
+
+
+def _slim_video_info(info: dict) -> dict:
+    """Reduce a yt-dlp info dict to the fields the UI needs."""
+    # Keep only the video-stream fields the UI reads; the raw format
+    # list carries fragment URLs and headers that would bloat the cache.
+    slim_formats = [
+        {
+            "vcodec": f.get("vcodec"),
+            "height": f.get("height"),
+            "format_id": f.get("format_id"),
+            "ext": f.get("ext"),
+        }
+        for f in info.get("formats", [])
+        if f.get("vcodec", "none") != "none" and f.get("height")
+    ]
+    return {
+        "title": info.get("title", "Unknown Title"),
+        "thumbnail": info.get("thumbnail", ""),
+        "formats": slim_formats,
+        "duration": info.get("duration", 0),
+        "uploader": info.get("uploader", "Unknown"),
+        "view_count": info.get("view_count", 0),
+    }
+
+
+def _store_video_info(cache: tuple, url: str, info: dict) -> None:
+    """Insert a fresh cache entry and drop any that are past the hard TTL."""
+    entries, _refreshing, lock = cache
+    now = time.time()
+    with lock:
+        entries[url] = {"info": info, "fetched_at": now}
+        expired = [
+            k for k, e in entries.items() if now - e["fetched_at"] > _INFO_HARD_TTL
+        ]
+        for key in expired:
+            del entries[key]
+
+
+def _refresh_video_info(
+    cache: tuple, local: threading.local, url: str, ffmpeg_dir: str | None
+) -> None:
+    """
+    Background refresh for a stale entry.  Runs on an extraction worker,
+    outside the Streamlit script, so failures are swallowed and the stale
+    entry is kept.
+    """
+    _entries, refreshing, lock = cache
+    try:
+        # Already on an extraction worker, so extract here directly rather
+        # than queueing more work behind ourselves on the same pool.
+        info = _extract_one(local, url, ffmpeg_dir=ffmpeg_dir)
+        _store_video_info(cache, url, _slim_video_info(info))
+    except Exception:  # noqa: BLE001
+        pass
+    finally:
+        with lock:
+            refreshing.discard(url)
+
+
 def get_video_info(url: str) -> dict | None:
     """
     Extract video metadata (title, thumbnail, available formats)
     without downloading any content.
 
     Returns a dict with keys: title, thumbnail, formats, duration, uploader
-    or None on failure.
+    or None on failure.  ``formats`` is trimmed to video streams and the
+    vcodec / height / format_id / ext fields.
     """
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "skip_download": True,
-        # 'extract_flat' is intentionally NOT set so we get full format list
-    }
-    if FFMPEG_DIR:
-        ydl_opts["ffmpeg_location"] = FFMPEG_DIR
+    cache = _info_cache()
+    entries, refreshing, lock = cache
+    with lock:
+        entry = entries.get(url)
+        age = time.time() - entry["fetched_at"] if entry else None
+        stale = entry and _INFO_SOFT_TTL < age <= _INFO_HARD_TTL
+        if stale and url not in refreshing:
+            refreshing.add(url)
+            pool, local = _extract_pool()
+            pool.submit(_refresh_video_info, cache, local, url, _ffmpeg_dir())
+    if entry and age <= _INFO_HARD_TTL:
+        return entry["info"]
+
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                "title": info.get("title", "Unknown Title"),
-                "thumbnail": info.get("thumbnail", ""),
-                "formats": info.get("formats", []),
-                "duration": info.get("duration", 0),
-                "uploader": info.get("uploader", "Unknown"),
-                "view_count": info.get("view_count", 0),
-            }
+        info = _slim_video_info(_extract_info(url))
     except yt_dlp.utils.DownloadError as exc:
         st.error(f"❌ Could not fetch video info: {exc}")
         return None
     except Exception as exc:  # noqa: BLE001
         st.error(f"❌ An unexpected error occurred: {exc}")
         return None
+    _store_video_info(cache, url, info)
+    return info
 
 
 # ─────────────────────────────────────────────
 # Core: parse available resolutions
 # ─────────────────────────────────────────────
+# Standard YouTube heights, tracked as bits of an int while scanning formats
+_STD_HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160, 4320)
+_STD_HEIGHT_BIT = {h: i for i, h in enumerate(_STD_HEIGHTS)}
+_STD_HEIGHT_LABELS = tuple(f"{h}p" for h in _STD_HEIGHTS)
+
+
 def get_available_resolutions(formats: list[dict]) -> list[str]:
     """
     Deduplicate and sort video resolutions available for download.
     Returns labels like ['1080p', '720p', '480p', '360p', '240p', '144p'].
     """
-    heights: set[int] = set()
+    mask = 0
+    # Non-standard heights (vertical Shorts, odd aspect ratios) still count
+    other: set[int] = set()
     for fmt in formats:
         # Only consider formats that have a video stream
-        if fmt.get("vcodec", "none") != "none" and fmt.get("height"):
-            heights.add(fmt["height"])
-
+        height = fmt.get("height")
+        if not height or fmt.get("vcodec", "none") == "none":
+            continue
+        bit = _STD_HEIGHT_BIT.get(height)
+        if bit is not None:
+            mask |= 1 << bit
+        else:
+            other.add(height)
+
+    # Common case: only standard heights, labels come straight off the mask
+    if not other:
+        return [
+            _STD_HEIGHT_LABELS[i]
+            for i in range(len(_STD_HEIGHTS) - 1, -1, -1)
+            if mask >> i & 1
+        ]
+
+    heights = other | {h for h, i in _STD_HEIGHT_BIT.items() if mask >> i & 1}
     # Sort descending and format as labels
     return [f"{h}p" for h in sorted(heights, reverse=True)]
 
@@ -233,6 +480,10 @@ def get_available_resolutions(formats: list[dict]) -> list[str]:
 # ─────────────────────────────────────────────
 # Core: download content
 # ─────────────────────────────────────────────
+# Minimum seconds between progress-bar updates during a download
+_PROGRESS_INTERVAL = 0.1
+
+
 def download_content(
     url: str,
     fmt: str,
@@ -240,6 +491,7 @@ def download_content(
     tmp_dir: str,
     progress_bar,
     status_text,
+    concurrent_fragments: int = 8,
 ) -> str | None:
     """
     Download the video/audio into *tmp_dir* and return the path to the
@@ -257,13 +509,31 @@ def download_content(
         Temporary directory to store downloaded files.
     progress_bar : streamlit progress bar widget
     status_text : streamlit empty widget for status messages
+    concurrent_fragments : int
+        Number of fragments fetched in parallel for fragmented (DASH/HLS)
+        video streams.
     """
+    # Per-stream (downloaded, total) bytes, keyed by yt-dlp format_id, so the
+    # progress bar reflects the video and audio streams together.
+    stream_progress: dict[str, tuple[int, int]] = {}
+    # yt-dlp calls the hook for every chunk; each widget update is a
+    # websocket message, so push at most one every _PROGRESS_INTERVAL s.
+    last_update = [0.0]
 
     def _progress_hook(d: dict) -> None:
         """yt-dlp progress callback → update Streamlit widgets."""
         if d["status"] == "downloading":
-            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-            downloaded = d.get("downloaded_bytes", 0)
+            format_id = d.get("info_dict", {}).get("format_id") or ""
+            stream_progress[format_id] = (
+                d.get("downloaded_bytes", 0),
+                d.get("total_bytes") or d.get("total_bytes_estimate") or 0,
+            )
+            now = time.monotonic()
+            if now - last_update[0] < _PROGRESS_INTERVAL:
+                return
+            last_update[0] = now
+            total = sum(t for _, t in stream_progress.values())
+            downloaded = sum(b for b, _ in stream_progress.values())
             if total > 0:
                 pct = min(downloaded / total, 1.0)
                 progress_bar.progress(pct, text=f"Downloading… {pct:.0%}")
@@ -272,6 +542,17 @@ def download_content(
         elif d["status"] == "finished":
             progress_bar.progress(1.0, text="Download complete — processing…")
 
+    # Path of the finished file, as reported by the last postprocessor
+    # (merge / audio extraction / final move) to complete.
+    final_path: dict[str, str] = {}
+
+    def _postprocessor_hook(d: dict) -> None:
+        """yt-dlp postprocessor callback → remember the output file path."""
+        if d["status"] == "finished":
+            filepath = d.get("info_dict", {}).get("filepath")
+            if filepath:
+                final_path["path"] = filepath
+
     output_template = os.path.join(tmp_dir, "%(title)s.%(ext)s")
 
     if fmt == "audio":
@@ -280,7 +561,10 @@ def download_content(
             "outtmpl": output_template,
             "quiet": True,
             "no_warnings": True,
+            # Write straight to the final name; no .part file + rename
+            "nopart": True,
             "progress_hooks": [_progress_hook],
+            "postprocessor_hooks": [_postprocessor_hook],
             "postprocessors": [
                 {
                     "key": "FFmpegExtractAudio",
@@ -289,8 +573,9 @@ def download_content(
                 }
             ],
         }
-        if FFMPEG_DIR:
-            ydl_opts["ffmpeg_location"] = FFMPEG_DIR
+        ffmpeg_dir = _ffmpeg_dir()
+        if ffmpeg_dir:
+            ydl_opts["ffmpeg_location"] = ffmpeg_dir
     else:
         # Extract numeric height from label like "720p"
         height = resolution.replace("p", "") if resolution else "720"
@@ -302,19 +587,47 @@ def download_content(
             "quiet": True,
             "no_warnings": True,
             "merge_output_format": "mp4",
+            # Write straight to the final name; no .part file + rename
+            "nopart": True,
+            # Remux the merged streams as-is and put the index up front.
+            # Scoped to the merger so MP3 extraction can still transcode.
+            "postprocessor_args": {
+                "merger": ["-c", "copy", "-movflags", "+faststart"],
+            },
+            "concurrent_fragment_downloads": concurrent_fragments,
             "progress_hooks": [_progress_hook],
+            "postprocessor_hooks": [_postprocessor_hook],
         }
-        if FFMPEG_DIR:
-            ydl_opts["ffmpeg_location"] = FFMPEG_DIR
+        ffmpeg_dir = _ffmpeg_dir()
+        if ffmpeg_dir:
+            ydl_opts["ffmpeg_location"] = ffmpeg_dir
+        # Hand fragmented DASH/HLS streams to aria2c when it is installed —
+        # it opens several connections per stream instead of one.
+        if shutil.which("aria2c"):
+            ydl_opts["external_downloader"] = {"dash": "aria2c", "m3u8": "aria2c"}
+            ydl_opts["external_downloader_args"] = {
+                "aria2c": [
+                    "-x", str(concurrent_fragments),
+                    "-s", str(concurrent_fragments),
+                    "-k", "1M",
+                ]
+            }
 
     try:
+        # Extract on the shared, already-connected instance; the per-job
+        # instance then selects formats and downloads.  Hooks and
+        # postprocessors are bound when a YoutubeDL is constructed, so the
+        # download side cannot be a cached instance with swapped params.
+        # process=False matters: a processed result already carries the
+        # extractor's default format selection (requested_formats), which
+        # the job's own "format" would not override.
+        info = _extract_info(url, process=False)
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+            ydl.process_ie_result(info, download=True)
 
-        # Find the resulting file in the temp directory
-        files = list(Path(tmp_dir).iterdir())
-        if files:
-            return str(files[0])
+        file_path = final_path.get("path")
+        if file_path and os.path.isfile(file_path):
+            return file_path
         st.error("❌ Download succeeded but no output file was found.")
         return None
     except yt_dlp.utils.DownloadError as exc:
@@ -440,6 +753,7 @@ if url:
             )
 
             selected_resolution = None
+            concurrent_fragments = 8
             if "Video" in format_choice:
                 resolutions = get_available_resolutions(info["formats"])
                 if resolutions:
@@ -449,6 +763,13 @@ if url:
                 else:
                     st.warning("No video-only streams found. The best available format will be used.")
                     selected_resolution = None
+                concurrent_fragments = st.slider(
+                    "⚡ Parallel fragments",
+                    min_value=1,
+                    max_value=16,
+                    value=8,
+                    help="How many stream fragments to download at the same time.",
+                )
 
             # ── Download trigger ────────────
             st.divider()
@@ -464,7 +785,13 @@ if url:
 
                 fmt = "audio" if "Audio" in format_choice else "video"
                 file_path = download_content(
-                    url, fmt, selected_resolution, tmp_dir, progress_bar, status_text
+                    url,
+                    fmt,
+                    selected_resolution,
+                    tmp_dir,
+                    progress_bar,
+                    status_text,
+                    concurrent_fragments,
                 )
 
                 if file_path and os.path.isfile(file_path):
@@ -481,14 +808,14 @@ if url:
                 file_name = os.path.basename(file_path)
                 mime = "audio/mpeg" if file_name.endswith(".mp3") else "video/mp4"
 
-                with open(file_path, "rb") as fh:
-                    st.download_button(
-                        label=f"💾  Save **{file_name}**",
-                        data=fh,
-                        file_name=file_name,
-                        mime=mime,
-                        use_container_width=True,
-                    )
+                st.download_button(
+                    label=f"💾  Save **{file_name}**",
+                    # Deferred: the file is only read when the user clicks
+                    data=Path(file_path).read_bytes,
+                    file_name=file_name,
+                    mime=mime,
+                    use_container_width=True,
+                )
 
 # ── Footer ──────────────────────────────────
 st.markdown(